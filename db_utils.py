@@ -3,11 +3,15 @@ Database Utility Script
 Tools for managing and querying the trends database
 """
 
+import csv
 import sqlite3
 import sys
 from datetime import datetime, timedelta
-from collections import Counter
-import json
+
+# Table row templates, bound once instead of re-parsing an f-string per row
+RECENT_ROW_FMT = "{:<40} {:<15} {:<20} {:<10} {:<10}".format
+SEARCH_ROW_FMT = "{:<40} {:<15} {:<20} {:<12}".format
+KEYWORD_ROW_FMT = "{:<4} {:<45} {:<12} {:<12} {:<10}".format
 
 
 class DatabaseUtils:
@@ -15,50 +19,153 @@ class DatabaseUtils:
     
     def __init__(self, db_name='trends_database.db'):
         self.db_name = db_name
+        self.conn = sqlite3.connect(
+            self.db_name,
+            isolation_level=None,
+            check_same_thread=False,
+            cached_statements=256
+        )
+        
+        # Connection-level tuning, applied once for the lifetime of the utility
+        self.conn.executescript('''
+            PRAGMA auto_vacuum=INCREMENTAL;
+            PRAGMA journal_mode=WAL;
+            PRAGMA synchronous=NORMAL;
+            PRAGMA temp_store=MEMORY;
+            PRAGMA mmap_size=268435456;
+            PRAGMA cache_size=-65536;
+            PRAGMA busy_timeout=5000;
+        ''')
+        
+        self.ensure_indexes()
     
-    def view_recent_trends(self, days=7, limit=50):
-        """View recent trends from the database"""
-        conn = sqlite3.connect(self.db_name)
-        cursor = conn.cursor()
+    def ensure_indexes(self):
+        """Create the indexes used by the time-window and keyword queries"""
+        cursor = self.conn.cursor()
         
-        date_threshold = (datetime.now() - timedelta(days=days)).strftime('%Y-%m-%d')
+        # The trends table is created by the extractor; nothing to index yet
+        cursor.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'trends'")
+        if cursor.fetchone() is None:
+            return
         
-        cursor.execute('''
-            SELECT keyword, platform, category, volume, sentiment_score, 
-                   engagement_score, timestamp
+        # Integer epoch seconds derived from the stored UTC timestamp text, so
+        # time-window filters compare integers instead of strings
+        columns = {row[1] for row in cursor.execute('PRAGMA table_xinfo(trends)')}
+        if 'ts_epoch' not in columns:
+            cursor.execute('''
+                ALTER TABLE trends ADD COLUMN ts_epoch INTEGER
+                GENERATED ALWAYS AS (CAST(strftime('%s', timestamp) AS INTEGER)) VIRTUAL
+            ''')
+        
+        # Ranking score used to order the recent-trends view
+        if 'score' not in columns:
+            cursor.execute('''
+                ALTER TABLE trends ADD COLUMN score REAL
+                GENERATED ALWAYS AS (volume + engagement_score) VIRTUAL
+            ''')
+        
+        cursor.executescript('''
+            CREATE INDEX IF NOT EXISTS idx_trends_ts ON trends(timestamp);
+            CREATE INDEX IF NOT EXISTS idx_trends_ts_epoch ON trends(ts_epoch);
+            CREATE INDEX IF NOT EXISTS idx_trends_kw_ts ON trends(keyword, timestamp);
+            CREATE INDEX IF NOT EXISTS idx_trends_platform ON trends(platform);
+            CREATE INDEX IF NOT EXISTS idx_trends_category ON trends(category);
+            CREATE INDEX IF NOT EXISTS idx_trends_score_ts ON trends(score DESC, ts_epoch);
+        ''')
+        
+        # Without statistics the planner may prefer idx_trends_ts_epoch plus a
+        # temp sort over idx_trends_score_ts; gather them once, then keep them
+        # fresh cheaply
+        cursor.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'sqlite_stat1'")
+        has_stats = cursor.fetchone() is not None and cursor.execute(
+            "SELECT 1 FROM sqlite_stat1 WHERE tbl = 'trends' LIMIT 1"
+        ).fetchone() is not None
+        cursor.execute('PRAGMA optimize' if has_stats else 'ANALYZE trends')
+        
+        self.ensure_search_index()
+    
+    def ensure_search_index(self):
+        """Create the FTS5 keyword index and the triggers that keep it in sync"""
+        cursor = self.conn.cursor()
+        
+        cursor.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'trends_fts'")
+        is_new = cursor.fetchone() is None
+        
+        cursor.executescript('''
+            CREATE VIRTUAL TABLE IF NOT EXISTS trends_fts
+                USING fts5(keyword, content='trends', content_rowid='id');
+            
+            CREATE TRIGGER IF NOT EXISTS trends_fts_ai AFTER INSERT ON trends BEGIN
+                INSERT INTO trends_fts(rowid, keyword) VALUES (new.id, new.keyword);
+            END;
+            
+            CREATE TRIGGER IF NOT EXISTS trends_fts_ad AFTER DELETE ON trends BEGIN
+                INSERT INTO trends_fts(trends_fts, rowid, keyword) VALUES ('delete', old.id, old.keyword);
+            END;
+            
+            CREATE TRIGGER IF NOT EXISTS trends_fts_au AFTER UPDATE OF keyword ON trends BEGIN
+                INSERT INTO trends_fts(trends_fts, rowid, keyword) VALUES ('delete', old.id, old.keyword);
+                INSERT INTO trends_fts(rowid, keyword) VALUES (new.id, new.keyword);
+            END;
+        ''')
+        
+        # Index rows that were stored before the FTS table existed
+        if is_new:
+            cursor.execute("INSERT INTO trends_fts(trends_fts) VALUES ('rebuild')")
+    
+    def close(self):
+        """Close the cached database connection"""
+        self.conn.close()
+    
+    def view_recent_trends(self, days=7, limit=50):
+        """View recent trends from the database"""
+        ts_threshold = int((datetime.now() - timedelta(days=days)).timestamp())
+        
+        cursor = self.conn.execute('''
+            SELECT keyword, platform, category,
+                   CAST(score AS INTEGER),
+                   CASE WHEN sentiment_score IS NULL THEN 'Not scored'
+                        WHEN sentiment_score > 0.3 THEN 'Positive'
+                        WHEN sentiment_score < -0.3 THEN 'Negative'
+                        ELSE 'Neutral' END AS sentiment,
+                   timestamp
             FROM trends
-            WHERE DATE(timestamp) >= ?
-            ORDER BY (volume + engagement_score) DESC
+            WHERE ts_epoch >= ?
+            ORDER BY score DESC
             LIMIT ?
-        ''', (date_threshold, limit))
+        ''', (ts_threshold, limit))
         
         rows = cursor.fetchall()
-        conn.close()
-        
-        print(f"\n{'='*100}")
-        print(f"RECENT TRENDS (Last {days} days)")
-        print(f"{'='*100}\n")
         
-        print(f"{'Keyword':<40} {'Platform':<15} {'Category':<20} {'Score':<10} {'Sentiment':<10}")
-        print("-" * 100)
+        # Collect the table and write it in one go rather than one print per row
+        out = [
+            f"\n{'='*100}",
+            f"RECENT TRENDS (Last {days} days)",
+            f"{'='*100}\n",
+            RECENT_ROW_FMT('Keyword', 'Platform', 'Category', 'Score', 'Sentiment'),
+            "-" * 100
+        ]
         
         for row in rows:
             keyword = row[0][:37] + "..." if len(row[0]) > 40 else row[0]
-            score = int(row[3] + row[5])
-            sentiment = 'Positive' if row[4] > 0.3 else 'Negative' if row[4] < -0.3 else 'Neutral'
-            
-            print(f"{keyword:<40} {row[1]:<15} {row[2]:<20} {score:<10} {sentiment:<10}")
+            out.append(RECENT_ROW_FMT(keyword, row[1], row[2], row[3], row[4]))
         
-        print(f"\nTotal trends found: {len(rows)}")
+        out.append(f"\nTotal trends found: {len(rows)}")
+        sys.stdout.write('\n'.join(out) + '\n')
     
     def get_statistics(self):
         """Get database statistics"""
-        conn = sqlite3.connect(self.db_name)
-        cursor = conn.cursor()
+        cursor = self.conn.cursor()
         
-        # Total trends
-        cursor.execute('SELECT COUNT(*) FROM trends')
-        total_trends = cursor.fetchone()[0]
+        # Total trends, average sentiment and date range in a single round-trip
+        cursor.execute('''
+            SELECT (SELECT COUNT(*) FROM trends),
+                   (SELECT AVG(sentiment_score) FROM trends),
+                   (SELECT MIN(timestamp) FROM trends),
+                   (SELECT MAX(timestamp) FROM trends)
+        ''')
+        total_trends, avg_sentiment, *date_range = cursor.fetchone()
+        avg_sentiment = avg_sentiment or 0
         
         # Trends by platform
         cursor.execute('SELECT platform, COUNT(*) FROM trends GROUP BY platform')
@@ -68,16 +175,6 @@ class DatabaseUtils:
         cursor.execute('SELECT category, COUNT(*) FROM trends GROUP BY category ORDER BY COUNT(*) DESC')
         category_stats = cursor.fetchall()
         
-        # Average sentiment
-        cursor.execute('SELECT AVG(sentiment_score) FROM trends')
-        avg_sentiment = cursor.fetchone()[0] or 0
-        
-        # Date range
-        cursor.execute('SELECT MIN(timestamp), MAX(timestamp) FROM trends')
-        date_range = cursor.fetchone()
-        
-        conn.close()
-        
         print(f"\n{'='*60}")
         print("DATABASE STATISTICS")
         print(f"{'='*60}\n")
@@ -98,138 +195,155 @@ class DatabaseUtils:
         for category, count in category_stats:
             print(f"{category:<30} {count:<10}")
     
-    def search_trends(self, keyword):
-        """Search for trends containing a keyword"""
-        conn = sqlite3.connect(self.db_name)
-        cursor = conn.cursor()
-        
-        cursor.execute('''
-            SELECT keyword, platform, category, volume, sentiment_score, 
-                   engagement_score, timestamp
-            FROM trends
-            WHERE keyword LIKE ?
-            ORDER BY timestamp DESC
-        ''', (f'%{keyword}%',))
-        
-        rows = cursor.fetchall()
-        conn.close()
-        
-        print(f"\n{'='*100}")
-        print(f"SEARCH RESULTS FOR: '{keyword}'")
-        print(f"{'='*100}\n")
-        
-        if not rows:
-            print("No trends found matching your search.")
-            return
-        
-        print(f"{'Keyword':<40} {'Platform':<15} {'Category':<20} {'Date':<12}")
-        print("-" * 100)
+    def search_trends(self, keyword, limit=200, offset=0):
+        """Search for trends containing a keyword, one page at a time"""
+        # Prefix-match every search term, quoted so FTS5 syntax in the input is literal
+        match_query = ' '.join('"' + term.replace('"', '""') + '"*' for term in keyword.split())
+        
+        cursor = self.conn.execute('''
+            SELECT t.keyword, t.platform, t.category, t.volume, t.sentiment_score, 
+                   t.engagement_score, t.timestamp
+            FROM trends_fts f
+            JOIN trends t ON t.id = f.rowid
+            WHERE trends_fts MATCH ?
+            ORDER BY t.timestamp DESC, t.id DESC
+            LIMIT ? OFFSET ?
+        ''', (match_query, limit, offset))
+        
+        if offset == 0:
+            out = [f"\n{'='*100}", f"SEARCH RESULTS FOR: '{keyword}'", f"{'='*100}\n"]
+        else:
+            out = [""]
         
-        for row in rows:
+        count = 0
+        for row in cursor:
+            if count == 0:
+                out.append(SEARCH_ROW_FMT('Keyword', 'Platform', 'Category', 'Date'))
+                out.append("-" * 100)
+            
             keyword_text = row[0][:37] + "..." if len(row[0]) > 40 else row[0]
             date = row[6][:10] if row[6] else 'N/A'
             
-            print(f"{keyword_text:<40} {row[1]:<15} {row[2]:<20} {date:<12}")
+            out.append(SEARCH_ROW_FMT(keyword_text, row[1], row[2], date))
+            count += 1
+        
+        if count == 0:
+            out.append("No trends found matching your search." if offset == 0 else "\nNo more results.")
+        else:
+            out.append(f"\nShowing results {offset + 1}-{offset + count}")
         
-        print(f"\nTotal results found: {len(rows)}")
+        sys.stdout.write('\n'.join(out) + '\n')
+        return count
     
     def export_to_csv(self, output_file='trends_export.csv', days=30):
         """Export trends to CSV file"""
-        conn = sqlite3.connect(self.db_name)
-        cursor = conn.cursor()
-        
-        date_threshold = (datetime.now() - timedelta(days=days)).strftime('%Y-%m-%d')
+        ts_threshold = int((datetime.now() - timedelta(days=days)).timestamp())
         
-        cursor.execute('''
+        cursor = self.conn.execute('''
             SELECT keyword, platform, category, volume, sentiment_score, 
                    engagement_score, timestamp
             FROM trends
-            WHERE DATE(timestamp) >= ?
+            WHERE ts_epoch >= ?
             ORDER BY timestamp DESC
-        ''', (date_threshold,))
+        ''', (ts_threshold,))
         
-        rows = cursor.fetchall()
-        conn.close()
-        
-        with open(output_file, 'w', encoding='utf-8') as f:
-            f.write('Keyword,Platform,Category,Volume,Sentiment Score,Engagement Score,Timestamp\n')
+        count = 0
+        with open(output_file, 'w', encoding='utf-8', newline='', buffering=1 << 20) as f:
+            writer = csv.writer(f)
+            writer.writerow(['Keyword', 'Platform', 'Category', 'Volume', 'Sentiment Score', 'Engagement Score', 'Timestamp'])
             
-            for row in rows:
-                # Escape commas in keyword
-                keyword = row[0].replace(',', ';')
-                f.write(f'"{keyword}",{row[1]},{row[2]},{row[3]},{row[4]},{row[5]},{row[6]}\n')
-        
-        print(f"\n✓ Exported {len(rows)} trends to {output_file}")
+            # Stream rows in chunks; csv.writer takes care of quoting
+            while True:
+                chunk = cursor.fetchmany(1000)
+                if not chunk:
+                    break
+                writer.writerows(chunk)
+                count += len(chunk)
+        
+        print(f"\n✓ Exported {count} trends to {output_file}")
     
     def clear_old_data(self, days=90):
         """Delete trends older than specified days"""
-        conn = sqlite3.connect(self.db_name)
-        cursor = conn.cursor()
+        cursor = self.conn.cursor()
         
-        date_threshold = (datetime.now() - timedelta(days=days)).strftime('%Y-%m-%d')
+        ts_threshold = int((datetime.now() - timedelta(days=days)).timestamp())
         
-        cursor.execute('SELECT COUNT(*) FROM trends WHERE DATE(timestamp) < ?', (date_threshold,))
+        cursor.execute('SELECT COUNT(*) FROM trends WHERE ts_epoch < ?', (ts_threshold,))
         count = cursor.fetchone()[0]
         
         if count == 0:
             print(f"\nNo trends older than {days} days found.")
-            conn.close()
             return
         
         print(f"\nFound {count} trends older than {days} days.")
         confirm = input("Are you sure you want to delete them? (yes/no): ")
         
         if confirm.lower() == 'yes':
-            cursor.execute('DELETE FROM trends WHERE DATE(timestamp) < ?', (date_threshold,))
-            conn.commit()
-            print(f"✓ Deleted {count} old trends.")
+            cursor.execute('BEGIN IMMEDIATE')
+            try:
+                cursor.execute('DELETE FROM trends WHERE ts_epoch < ?', (ts_threshold,))
+                deleted = cursor.rowcount
+                cursor.execute('COMMIT')
+            except sqlite3.Error:
+                cursor.execute('ROLLBACK')
+                raise
+            
+            # Reclaim freed pages (only effective with auto_vacuum=INCREMENTAL)
+            # and refresh planner statistics after the bulk delete. The pragma
+            # frees one page per result row, so it must be stepped to completion
+            self.conn.executescript('PRAGMA incremental_vacuum;')
+            cursor.execute('ANALYZE trends')
+            print(f"✓ Deleted {deleted} old trends.")
         else:
             print("Operation cancelled.")
-        
-        conn.close()
     
     def get_trending_keywords(self, days=7, top_n=20):
         """Get most frequently appearing keywords"""
-        conn = sqlite3.connect(self.db_name)
-        cursor = conn.cursor()
-        
-        date_threshold = (datetime.now() - timedelta(days=days)).strftime('%Y-%m-%d')
+        ts_threshold = int((datetime.now() - timedelta(days=days)).timestamp())
         
-        cursor.execute('''
+        cursor = self.conn.execute('''
             SELECT keyword, COUNT(*) as frequency, 
-                   AVG(volume) as avg_volume,
-                   AVG(sentiment_score) as avg_sentiment
+                   CAST(AVG(volume) AS INTEGER) as avg_volume,
+                   CASE WHEN AVG(sentiment_score) IS NULL THEN 'Not scored'
+                        WHEN AVG(sentiment_score) > 0.3 THEN 'Positive'
+                        WHEN AVG(sentiment_score) < -0.3 THEN 'Negative'
+                        ELSE 'Neutral' END as sentiment
             FROM trends
-            WHERE DATE(timestamp) >= ?
+            WHERE ts_epoch >= ?
             GROUP BY keyword
-            ORDER BY frequency DESC, avg_volume DESC
+            ORDER BY frequency DESC, AVG(volume) DESC
             LIMIT ?
-        ''', (date_threshold, top_n))
+        ''', (ts_threshold, top_n))
         
         rows = cursor.fetchall()
-        conn.close()
         
-        print(f"\n{'='*100}")
-        print(f"TOP {top_n} TRENDING KEYWORDS (Last {days} days)")
-        print(f"{'='*100}\n")
-        
-        print(f"{'#':<4} {'Keyword':<45} {'Frequency':<12} {'Avg Volume':<12} {'Sentiment':<10}")
-        print("-" * 100)
+        out = [
+            f"\n{'='*100}",
+            f"TOP {top_n} TRENDING KEYWORDS (Last {days} days)",
+            f"{'='*100}\n",
+            KEYWORD_ROW_FMT('#', 'Keyword', 'Frequency', 'Avg Volume', 'Sentiment'),
+            "-" * 100
+        ]
         
         for idx, row in enumerate(rows, 1):
             keyword = row[0][:42] + "..." if len(row[0]) > 45 else row[0]
-            sentiment = 'Positive' if row[3] > 0.3 else 'Negative' if row[3] < -0.3 else 'Neutral'
-            
-            print(f"{idx:<4} {keyword:<45} {row[1]:<12} {int(row[2]):<12} {sentiment:<10}")
+            out.append(KEYWORD_ROW_FMT(idx, keyword, row[1], row[2], row[3]))
+        
+        sys.stdout.write('\n'.join(out) + '\n')
     
     def backup_database(self, backup_file=None):
         """Create a backup of the database"""
         if backup_file is None:
             backup_file = f"trends_backup_{datetime.now().strftime('%Y%m%d_%H%M%S')}.db"
         
-        import shutil
         try:
-            shutil.copy2(self.db_name, backup_file)
+            # Online backup API: consistent copy even while WAL writers are active
+            backup_conn = sqlite3.connect(backup_file)
+            try:
+                with backup_conn:
+                    self.conn.backup(backup_conn, pages=1024)
+            finally:
+                backup_conn.close()
             print(f"\n✓ Database backed up to: {backup_file}")
         except Exception as e:
             print(f"\n✗ Error creating backup: {e}")
@@ -272,7 +386,11 @@ def main():
         elif choice == '3':
             keyword = input("Enter keyword to search: ").strip()
             if keyword:
-                db_utils.search_trends(keyword)
+                limit, offset = 200, 0
+                while db_utils.search_trends(keyword, limit=limit, offset=offset) == limit:
+                    if input("Show more? (y/n): ").strip().lower() != 'y':
+                        break
+                    offset += limit
         
         elif choice == '4':
             days = input("Enter number of days (default 7): ").strip()
@@ -299,6 +417,7 @@ def main():
             db_utils.backup_database(backup_file=backup_file)
         
         elif choice == '8':
+            db_utils.close()
             print("\nExiting... Goodbye!")
             break
         
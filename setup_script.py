@@ -5,7 +5,9 @@ Run this to create necessary directories and check dependencies
 
 import os
 import sys
+import json
 import subprocess
+from importlib.metadata import distribution, version, PackageNotFoundError
 
 def create_directories():
     """Create necessary directories for the project"""
@@ -15,49 +17,72 @@ def create_directories():
         'data'
     ]
     
+    # One directory listing instead of a makedirs stat walk per directory
+    existing = {entry.name for entry in os.scandir('.') if entry.is_dir()}
+    
     for directory in directories:
-        os.makedirs(directory, exist_ok=True)
-        print(f"✓ Created directory: {directory}")
+        if directory in existing:
+            print(f"✓ Directory exists: {directory}")
+        else:
+            os.mkdir(directory)
+            print(f"✓ Created directory: {directory}")
+
+def find_missing_requirements():
+    """Return (name, version, requested) for each package pip would still install, or None if pip can't tell"""
+    # A single dry-run resolve reports everything missing from requirements.txt
+    try:
+        result = subprocess.run(
+            [sys.executable, "-m", "pip", "install", "--dry-run", "--quiet",
+             "--report", "-", "-r", "requirements.txt"],
+            capture_output=True, text=True, timeout=300
+        )
+        report = json.loads(result.stdout) if result.returncode == 0 else None
+    except (subprocess.SubprocessError, ValueError):
+        report = None
+    
+    if not report:
+        return None
+    
+    return [
+        (item['metadata']['name'], item['metadata']['version'], item.get('requested', False))
+        for item in report.get('install', [])
+    ]
 
 def check_dependencies():
     """Check if all required packages are installed"""
     print("\nChecking dependencies...")
     
-    try:
-        import google.generativeai
-        print("✓ google-generativeai installed")
-    except ImportError:
-        print("✗ google-generativeai not installed")
+    missing = find_missing_requirements() if os.path.exists('requirements.txt') else None
+    if missing is not None:
+        for name, required, requested in missing:
+            if not requested:
+                continue
+            # pip also lists packages that are installed at a different version
+            try:
+                print(f"✗ {name} installed {version(name)}, requires {required}")
+            except PackageNotFoundError:
+                print(f"✗ {name} not installed")
+        
+        dependencies = sum(1 for _, _, requested in missing if not requested)
+        if dependencies:
+            print(f"  (plus {dependencies} {'dependency' if dependencies == 1 else 'dependencies'} of these packages)")
+        if not missing:
+            print("✓ All packages in requirements.txt are installed")
+        return missing
     
-    try:
-        import pytrends
-        print("✓ pytrends installed")
-    except ImportError:
-        print("✗ pytrends not installed")
+    # Fall back to probing the core packages individually. Look up installed
+    # distribution metadata only; importing the packages themselves
+    # (matplotlib, seaborn) would run their heavy init code
+    packages = ['google-genai', 'pytrends', 'praw', 'orjson', 'matplotlib', 'seaborn', 'reportlab']
     
-    try:
-        import praw
-        print("✓ praw installed")
-    except ImportError:
-        print("✗ praw not installed")
-    
-    try:
-        import matplotlib
-        print("✓ matplotlib installed")
-    except ImportError:
-        print("✗ matplotlib not installed")
+    for name in packages:
+        try:
+            distribution(name)
+            print(f"✓ {name} installed")
+        except PackageNotFoundError:
+            print(f"✗ {name} not installed")
     
-    try:
-        import seaborn
-        print("✓ seaborn installed")
-    except ImportError:
-        print("✗ seaborn not installed")
-    
-    try:
-        import reportlab
-        print("✓ reportlab installed")
-    except ImportError:
-        print("✗ reportlab not installed")
+    return None
 
 def install_dependencies():
     """Install all dependencies from requirements.txt"""
@@ -89,13 +114,14 @@ def main():
     check_env_file()
     
     # Check dependencies
-    check_dependencies()
+    missing = check_dependencies()
     
-    # Ask if user wants to install dependencies
-    print("\n" + "="*60)
-    response = input("\nDo you want to install missing dependencies? (y/n): ")
-    if response.lower() == 'y':
-        install_dependencies()
+    # Ask if user wants to install dependencies (unless pip reported none missing)
+    if missing is None or missing:
+        print("\n" + "="*60)
+        response = input("\nDo you want to install missing dependencies? (y/n): ")
+        if response.lower() == 'y':
+            install_dependencies()
     
     print("\n" + "="*60)
     print("SETUP COMPLETE!")
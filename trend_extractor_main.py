@@ -5,15 +5,28 @@ Monitors social media platforms and extracts trending topics for digital marketi
 
 import os
 import json
+import hashlib
 import sqlite3
 from datetime import datetime, timedelta
-import time
-from typing import List, Dict, Any
-import google.generativeai as genai
+import random
+import asyncio
+import threading
+import traceback
+import heapq
+from operator import itemgetter
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Dict, Any, Optional, Iterable, Iterator
+import httpx
+import orjson
+from google import genai
+from google.genai import types
 from pytrends.request import TrendReq
 import praw
 import requests
-from collections import Counter
+import numpy as np
+import pandas as pd
+import matplotlib
+matplotlib.use('Agg')  # Charts are only written to files; no GUI backend needed
 import matplotlib.pyplot as plt
 import seaborn as sns
 from reportlab.lib.pagesizes import letter, A4
@@ -24,6 +37,9 @@ from reportlab.lib import colors
 from reportlab.lib.enums import TA_CENTER, TA_LEFT
 import re
 
+# Column layout of the current trends table printed by main()
+SUMMARY_ROW_FMT = "{:<4} {:<50} {:<25} {:<10} {:<10}".format
+
 # Configuration
 class Config:
     # API Keys - Set these as environment variables
@@ -32,6 +48,9 @@ class Config:
     REDDIT_CLIENT_SECRET = os.getenv('REDDIT_CLIENT_SECRET', 'YOUR_REDDIT_CLIENT_SECRET')
     REDDIT_USER_AGENT = os.getenv('REDDIT_USER_AGENT', 'TrendExtractor/1.0')
     
+    # Gemini model used for sentiment scoring
+    GEMINI_MODEL = 'gemini-1.5-flash'
+    
     # Marketing Keywords
     MARKETING_KEYWORDS = [
         'digital marketing', 'social media marketing', 'content marketing',
@@ -52,6 +71,12 @@ class Config:
         'Emerging Tech': ['AI', 'chatbot', 'automation', 'machine learning', 'AR', 'VR', 'metaverse']
     }
     
+    # Filtering: Reddit posts below this score + comment count are dropped, and
+    # at most MAX_TRENDS of the highest-scoring keywords are sent for sentiment
+    # analysis per run (the rest are kept but never scored: sentiment is NULL)
+    MIN_ENGAGEMENT = 25
+    MAX_TRENDS = 200
+    
     # Database
     DB_NAME = 'trends_database.db'
     
@@ -63,14 +88,31 @@ class Config:
 class DatabaseManager:
     """Manages SQLite database for storing historical trend data"""
     
+    # Kept as one constant string so sqlite3's statement cache reuses the prepared insert
+    INSERT_TREND_SQL = '''
+        INSERT INTO trends (keyword, platform, category, volume, sentiment_score, engagement_score, metadata)
+        VALUES (?, ?, ?, ?, ?, ?, ?)
+    '''
+    
+    # Column order of the rows yielded by iter_historical_trends
+    HISTORY_COLUMNS = ['keyword', 'platform', 'category', 'volume', 'sentiment_score', 'engagement_score', 'timestamp', 'metadata']
+    
     def __init__(self, db_name: str):
         self.db_name = db_name
+        self.conn = sqlite3.connect(db_name, isolation_level=None, check_same_thread=False)
         self.init_database()
     
     def init_database(self):
         """Initialize database with required tables"""
-        conn = sqlite3.connect(self.db_name)
-        cursor = conn.cursor()
+        cursor = self.conn.cursor()
+        
+        # Must precede the first CREATE TABLE to take effect; lets db_utils hand
+        # pages freed by clear_old_data back to the OS with incremental_vacuum
+        cursor.execute('PRAGMA auto_vacuum=INCREMENTAL')
+        
+        # WAL keeps readers unblocked and NORMAL sync avoids an fsync per commit
+        cursor.execute('PRAGMA journal_mode=WAL')
+        cursor.execute('PRAGMA synchronous=NORMAL')
         
         cursor.execute('''
             CREATE TABLE IF NOT EXISTS trends (
@@ -86,6 +128,10 @@ class DatabaseManager:
             )
         ''')
         
+        # Same indexes db_utils creates: time-window reads and per-keyword lookups
+        cursor.execute('CREATE INDEX IF NOT EXISTS idx_trends_ts ON trends(timestamp)')
+        cursor.execute('CREATE INDEX IF NOT EXISTS idx_trends_kw_ts ON trends(keyword, timestamp)')
+        
         cursor.execute('''
             CREATE TABLE IF NOT EXISTS reports (
                 id INTEGER PRIMARY KEY AUTOINCREMENT,
@@ -96,49 +142,81 @@ class DatabaseManager:
             )
         ''')
         
-        conn.commit()
-        conn.close()
-    
-    def save_trend(self, trend_data: Dict[str, Any]):
-        """Save trend data to database"""
-        conn = sqlite3.connect(self.db_name)
-        cursor = conn.cursor()
-        
         cursor.execute('''
-            INSERT INTO trends (keyword, platform, category, volume, sentiment_score, engagement_score, metadata)
-            VALUES (?, ?, ?, ?, ?, ?, ?)
-        ''', (
+            CREATE TABLE IF NOT EXISTS sentiment_cache (
+                text_hash TEXT PRIMARY KEY,
+                score REAL
+            )
+        ''')
+    
+    def close(self):
+        """Close the database connection"""
+        self.conn.close()
+    
+    @staticmethod
+    def _trend_row(trend_data: Dict[str, Any]) -> tuple:
+        """Convert a trend dict into an insert parameter tuple"""
+        return (
             trend_data['keyword'],
             trend_data['platform'],
             trend_data.get('category', 'Uncategorized'),
             trend_data.get('volume', 0),
             trend_data.get('sentiment_score', 0.0),
             trend_data.get('engagement_score', 0.0),
-            json.dumps(trend_data.get('metadata', {}))
-        ))
-        
-        conn.commit()
-        conn.close()
+            # orjson is C-backed; decoded so the column keeps holding JSON text
+            orjson.dumps(trend_data.get('metadata', {})).decode('utf-8')
+        )
     
-    def get_historical_trends(self, days: int = 30) -> List[Dict[str, Any]]:
-        """Retrieve historical trends from the last N days"""
-        conn = sqlite3.connect(self.db_name)
-        cursor = conn.cursor()
-        
+    def save_trend(self, trend_data: Dict[str, Any]):
+        """Save trend data to database"""
+        self.conn.execute(self.INSERT_TREND_SQL, self._trend_row(trend_data))
+    
+    def save_trends(self, trends: Iterable[Dict[str, Any]]):
+        """Save many trends to database in a single transaction"""
+        self.conn.execute('BEGIN')
+        try:
+            # executemany pulls rows from the iterator one at a time, so no row list is built
+            self.conn.executemany(self.INSERT_TREND_SQL, map(self._trend_row, trends))
+        except Exception:
+            self.conn.execute('ROLLBACK')
+            raise
+        self.conn.execute('COMMIT')
+    
+    def load_sentiment_cache(self) -> Dict[str, float]:
+        """Load all cached sentiment scores keyed by text hash"""
+        return dict(self.conn.execute('SELECT text_hash, score FROM sentiment_cache'))
+    
+    def save_sentiment_scores(self, scores: Dict[str, float]):
+        """Persist sentiment scores keyed by text hash"""
+        self.conn.execute('BEGIN')
+        try:
+            self.conn.executemany('INSERT OR IGNORE INTO sentiment_cache (text_hash, score) VALUES (?, ?)', scores.items())
+        except sqlite3.Error:
+            self.conn.execute('ROLLBACK')
+            raise
+        self.conn.execute('COMMIT')
+    
+    def iter_historical_trends(self, days: int = 30, limit: Optional[int] = None) -> Iterator[tuple]:
+        """Yield raw trend rows (HISTORY_COLUMNS order) from the last N days, newest first"""
         date_threshold = (datetime.now() - timedelta(days=days)).strftime('%Y-%m-%d')
         
-        cursor.execute('''
+        # Compare the raw column (not DATE(timestamp)) so idx_trends_ts serves both
+        # the filter and the ordering; 'YYYY-MM-DD' sorts before any time on that day
+        cursor = self.conn.execute('''
             SELECT keyword, platform, category, volume, sentiment_score, engagement_score, timestamp, metadata
             FROM trends
-            WHERE DATE(timestamp) >= ?
+            WHERE timestamp >= ?
             ORDER BY timestamp DESC
-        ''', (date_threshold,))
-        
-        rows = cursor.fetchall()
-        conn.close()
+            LIMIT ?
+        ''', (date_threshold, -1 if limit is None else limit))
         
+        # The cursor steps through the result set lazily; nothing is fetched up front
+        return cursor
+    
+    def get_historical_trends(self, days: int = 30, limit: Optional[int] = None) -> List[Dict[str, Any]]:
+        """Retrieve historical trends from the last N days, newest first"""
         trends = []
-        for row in rows:
+        for row in self.iter_historical_trends(days, limit):
             trends.append({
                 'keyword': row[0],
                 'platform': row[1],
@@ -147,7 +225,7 @@ class DatabaseManager:
                 'sentiment_score': row[4],
                 'engagement_score': row[5],
                 'timestamp': row[6],
-                'metadata': json.loads(row[7]) if row[7] else {}
+                'metadata': orjson.loads(row[7]) if row[7] else {}
             })
         
         return trends
@@ -156,122 +234,257 @@ class DatabaseManager:
 class GoogleTrendsMonitor:
     """Monitor Google Trends for marketing-related keywords"""
     
+    # Kept low: Google Trends throttles aggressive clients
+    MAX_CONCURRENT = 3
+    MAX_JITTER = 0.5
+    
     def __init__(self):
-        self.pytrends = TrendReq(hl='en-US', tz=360)
+        # TrendReq keeps per-request payload state, so each worker thread gets its own
+        self._local = threading.local()
     
-    def get_trending_topics(self, keywords: List[str], timeframe: str = 'now 7-d') -> List[Dict[str, Any]]:
-        """Fetch trending data for specified keywords"""
+    @property
+    def pytrends(self) -> TrendReq:
+        """Return the pytrends client owned by the calling thread"""
+        if not hasattr(self._local, 'pytrends'):
+            self._local.pytrends = TrendReq(hl='en-US', tz=360)
+        return self._local.pytrends
+    
+    def _fetch_batch(self, batch: List[str], timeframe: str) -> List[Dict[str, Any]]:
+        """Fetch interest-over-time data for up to 5 keywords"""
         trends_data = []
         
-        # Google Trends allows max 5 keywords at a time
-        for i in range(0, len(keywords), 5):
-            batch = keywords[i:i+5]
+        try:
+            self.pytrends.build_payload(batch, timeframe=timeframe, geo='US')
+            interest_over_time = self.pytrends.interest_over_time()
             
-            try:
-                self.pytrends.build_payload(batch, timeframe=timeframe, geo='US')
-                interest_over_time = self.pytrends.interest_over_time()
-                
-                if not interest_over_time.empty:
-                    for keyword in batch:
-                        if keyword in interest_over_time.columns:
-                            volume = int(interest_over_time[keyword].mean())
-                            
-                            trends_data.append({
-                                'keyword': keyword,
-                                'platform': 'Google Trends',
-                                'volume': volume,
-                                'metadata': {
-                                    'max_interest': int(interest_over_time[keyword].max()),
-                                    'trend_direction': 'rising' if interest_over_time[keyword].iloc[-1] > interest_over_time[keyword].iloc[0] else 'falling'
-                                }
-                            })
-                
-                time.sleep(2)  # Respect rate limits
-                
-            except Exception as e:
-                print(f"Error fetching Google Trends for {batch}: {e}")
+            if not interest_over_time.empty:
+                for keyword in batch:
+                    if keyword in interest_over_time.columns:
+                        volume = int(interest_over_time[keyword].mean())
+                        
+                        trends_data.append({
+                            'keyword': keyword,
+                            'platform': 'Google Trends',
+                            'volume': volume,
+                            'metadata': {
+                                'max_interest': int(interest_over_time[keyword].max()),
+                                'trend_direction': 'rising' if interest_over_time[keyword].iloc[-1] > interest_over_time[keyword].iloc[0] else 'falling'
+                            }
+                        })
+            
+        except Exception as e:
+            print(f"Error fetching Google Trends for {batch}: {e}")
         
         return trends_data
+    
+    async def _one_batch(self, semaphore: asyncio.Semaphore, batch: List[str], timeframe: str) -> List[Dict[str, Any]]:
+        """Fetch one batch once a concurrency slot is free"""
+        async with semaphore:
+            # Small random spacing instead of a fixed pause, to respect rate limits
+            await asyncio.sleep(random.uniform(0, self.MAX_JITTER))
+            return await asyncio.to_thread(self._fetch_batch, batch, timeframe)
+    
+    async def fetch_all(self, keywords: List[str], timeframe: str = 'now 7-d') -> List[List[Dict[str, Any]]]:
+        """Fetch all keyword batches concurrently, at most MAX_CONCURRENT at a time"""
+        semaphore = asyncio.Semaphore(self.MAX_CONCURRENT)
+        
+        # Google Trends allows max 5 keywords at a time
+        batches = [keywords[i:i+5] for i in range(0, len(keywords), 5)]
+        
+        return await asyncio.gather(*(self._one_batch(semaphore, batch, timeframe) for batch in batches))
+    
+    def iter_trending_topics(self, keywords: List[str], timeframe: str = 'now 7-d') -> Iterator[Dict[str, Any]]:
+        """Yield trending data for specified keywords, batch by batch"""
+        for batch_trends in asyncio.run(self.fetch_all(keywords, timeframe)):
+            yield from batch_trends
+    
+    def get_trending_topics(self, keywords: List[str], timeframe: str = 'now 7-d') -> List[Dict[str, Any]]:
+        """Fetch trending data for specified keywords"""
+        return list(self.iter_trending_topics(keywords, timeframe))
 
 
 class RedditMonitor:
     """Monitor Reddit for marketing-related discussions"""
     
-    def __init__(self, client_id: str, client_secret: str, user_agent: str):
-        self.reddit = praw.Reddit(
-            client_id=client_id,
-            client_secret=client_secret,
-            user_agent=user_agent
-        )
+    MAX_WORKERS = 8
     
-    def get_trending_topics(self, subreddits: List[str] = None, limit: int = 50) -> List[Dict[str, Any]]:
-        """Fetch trending topics from specified subreddits"""
-        if subreddits is None:
-            subreddits = ['marketing', 'digital_marketing', 'SEO', 'socialmedia', 'content_marketing']
+    def __init__(self, client_id: str, client_secret: str, user_agent: str, min_engagement: int = Config.MIN_ENGAGEMENT):
+        self.min_engagement = min_engagement
+        self._credentials = {
+            'client_id': client_id,
+            'client_secret': client_secret,
+            'user_agent': user_agent
+        }
+        self.reddit = praw.Reddit(**self._credentials)
         
+        # PRAW instances are not thread safe, so worker threads build their own
+        self._local = threading.local()
+    
+    def _client(self) -> praw.Reddit:
+        """Return the Reddit client owned by the calling thread"""
+        if not hasattr(self._local, 'reddit'):
+            self._local.reddit = praw.Reddit(**self._credentials)
+        return self._local.reddit
+    
+    def _fetch_subreddit(self, subreddit_name: str, limit: int) -> List[Dict[str, Any]]:
+        """Fetch hot posts from a single subreddit"""
         trends_data = []
         
-        for subreddit_name in subreddits:
-            try:
-                subreddit = self.reddit.subreddit(subreddit_name)
-                
-                for post in subreddit.hot(limit=limit):
-                    engagement_score = post.score + post.num_comments
-                    
-                    trends_data.append({
-                        'keyword': post.title,
-                        'platform': 'Reddit',
-                        'volume': post.score,
-                        'engagement_score': engagement_score,
-                        'metadata': {
-                            'subreddit': subreddit_name,
-                            'url': f"https://reddit.com{post.permalink}",
-                            'comments': post.num_comments,
-                            'upvote_ratio': post.upvote_ratio
-                        }
-                    })
+        try:
+            subreddit = self._client().subreddit(subreddit_name)
+            
+            for post in subreddit.hot(limit=limit):
+                # The listing response already populated these fields; read them
+                # straight from the instance dict rather than through PRAW's
+                # attribute lookup (which would lazily re-fetch anything missing)
+                fields = vars(post)
+                score = fields.get('score', 0)
+                num_comments = fields.get('num_comments', 0)
                 
-                time.sleep(1)
+                # Low-engagement posts never make the report; skip them before sentiment analysis
+                if score + num_comments < self.min_engagement:
+                    continue
                 
-            except Exception as e:
-                print(f"Error fetching Reddit data from r/{subreddit_name}: {e}")
+                trends_data.append({
+                    'keyword': fields['title'],
+                    'platform': 'Reddit',
+                    'volume': score,
+                    'engagement_score': score + num_comments,
+                    'metadata': {
+                        'subreddit': subreddit_name,
+                        'url': f"https://reddit.com{fields.get('permalink', '')}",
+                        'comments': num_comments,
+                        'upvote_ratio': fields.get('upvote_ratio')
+                    }
+                })
+            
+        except Exception as e:
+            print(f"Error fetching Reddit data from r/{subreddit_name}: {e}")
         
         return trends_data
+    
+    def iter_trending_topics(self, subreddits: List[str] = None, limit: int = 50) -> Iterator[Dict[str, Any]]:
+        """Yield trending topics from specified subreddits, subreddit by subreddit"""
+        if subreddits is None:
+            subreddits = ['marketing', 'digital_marketing', 'SEO', 'socialmedia', 'content_marketing']
+        
+        # Subreddit fetches are network-bound; PRAW handles 429 backoff itself
+        with ThreadPoolExecutor(max_workers=min(self.MAX_WORKERS, len(subreddits) or 1)) as executor:
+            for posts in executor.map(lambda name: self._fetch_subreddit(name, limit), subreddits):
+                yield from posts
+    
+    def get_trending_topics(self, subreddits: List[str] = None, limit: int = 50) -> List[Dict[str, Any]]:
+        """Fetch trending topics from specified subreddits"""
+        return list(self.iter_trending_topics(subreddits, limit))
 
 
 class SentimentAnalyzer:
     """Analyze sentiment using Gemini API"""
     
-    def __init__(self, api_key: str):
-        genai.configure(api_key=api_key)
-        self.model = genai.GenerativeModel('gemini-pro')
+    # Texts scored per Gemini request, and requests in flight at once
+    BATCH_SIZE = 50
+    MAX_WORKERS = 4
+    
+    def __init__(self, api_key: str, db: 'DatabaseManager' = None, model: str = Config.GEMINI_MODEL):
+        # One client for every request: pooled keep-alive connections over HTTP/2
+        # let the concurrent batches share TLS sessions instead of reconnecting
+        self.client = genai.Client(
+            api_key=api_key,
+            http_options=types.HttpOptions(client_args={
+                'http2': True,
+                'limits': httpx.Limits(max_keepalive_connections=self.MAX_WORKERS * 2)
+            })
+        )
+        self.model = model
+        
+        # Scores already paid for in earlier runs, keyed by SHA1 of the analyzed text
+        self.db = db
+        self._cache = db.load_sentiment_cache() if db else {}
+    
+    @staticmethod
+    def _text_hash(text: str) -> str:
+        """Cache key for a text (only the first 500 characters are analyzed)"""
+        return hashlib.sha1(text[:500].encode('utf-8')).hexdigest()
+    
+    def _remember(self, scores: Dict[str, float]):
+        """Add freshly computed scores to the in-memory and on-disk cache"""
+        self._cache.update(scores)
+        if self.db:
+            self.db.save_sentiment_scores(scores)
     
     def analyze_sentiment(self, text: str) -> float:
         """Analyze sentiment and return score (-1 to 1)"""
+        text_hash = self._text_hash(text)
+        if text_hash in self._cache:
+            return self._cache[text_hash]
+        
         try:
             prompt = f"""Analyze the sentiment of the following text and provide a sentiment score between -1 (very negative) and 1 (very positive).
 Return ONLY a number between -1 and 1, nothing else.
 
 Text: {text[:500]}"""
             
-            response = self.model.generate_content(prompt)
+            response = self.client.models.generate_content(model=self.model, contents=prompt)
             score_text = response.text.strip()
             
             # Extract number from response
             score = float(re.findall(r'-?\d+\.?\d*', score_text)[0])
-            return max(-1, min(1, score))
+            score = max(-1, min(1, score))
             
         except Exception as e:
             print(f"Error analyzing sentiment: {e}")
             return 0.0
+        
+        self._remember({text_hash: score})
+        return score
+    
+    def _analyze_chunk(self, texts: List[str]) -> Optional[List[float]]:
+        """Score up to BATCH_SIZE texts with a single Gemini request, None on failure"""
+        try:
+            numbered = "\n".join(f"{i}. {' '.join(text[:500].split())}" for i, text in enumerate(texts, 1))
+            prompt = f"""Analyze the sentiment of each numbered text below and provide a sentiment score between -1 (very negative) and 1 (very positive).
+Return ONLY a JSON array of {len(texts)} numbers between -1 and 1, one per text, in the same order, nothing else.
+
+{numbered}"""
+            
+            response = self.client.models.generate_content(model=self.model, contents=prompt)
+            scores = json.loads(re.search(r'\[.*\]', response.text, re.S).group(0))
+            
+            if len(scores) != len(texts):
+                raise ValueError(f"expected {len(texts)} scores, got {len(scores)}")
+            
+            return [max(-1.0, min(1.0, float(score))) for score in scores]
+            
+        except Exception as e:
+            print(f"Error analyzing sentiment batch: {e}")
+            return None
     
     def batch_analyze(self, texts: List[str]) -> List[float]:
         """Analyze sentiment for multiple texts"""
-        scores = []
-        for text in texts:
-            scores.append(self.analyze_sentiment(text))
-            time.sleep(0.5)  # Rate limiting
-        return scores
+        hashes = [self._text_hash(text) for text in texts]
+        
+        # Only send texts that have never been scored, each one once
+        pending = {}
+        for text_hash, text in zip(hashes, texts):
+            if text_hash not in self._cache:
+                pending.setdefault(text_hash, text)
+        
+        pending_hashes = list(pending)
+        chunks = [pending_hashes[i:i + self.BATCH_SIZE] for i in range(0, len(pending_hashes), self.BATCH_SIZE)]
+        
+        with ThreadPoolExecutor(max_workers=self.MAX_WORKERS) as executor:
+            results = executor.map(lambda chunk: self._analyze_chunk([pending[h] for h in chunk]), chunks)
+            
+            fresh = {}
+            for chunk, scores in zip(chunks, results):
+                if scores is not None:
+                    fresh.update(zip(chunk, scores))
+        
+        if fresh:
+            self._remember(fresh)
+        
+        # Failed chunks fall back to neutral and are retried on the next run
+        return [self._cache.get(text_hash, 0.0) for text_hash in hashes]
 
 
 class TrendCategorizer:
@@ -279,16 +492,25 @@ class TrendCategorizer:
     
     def __init__(self, categories: Dict[str, List[str]]):
         self.categories = categories
+        
+        # One case-insensitive whole-word alternation per category (plurals allowed),
+        # longest keywords first
+        self._patterns = {
+            category: re.compile(
+                r'\b(' + '|'.join(re.escape(kw) for kw in sorted(keywords, key=len, reverse=True)) + r')s?\b',
+                re.IGNORECASE
+            )
+            for category, keywords in categories.items()
+        }
     
     def categorize(self, keyword: str) -> str:
         """Categorize a keyword based on category keywords"""
-        keyword_lower = keyword.lower()
-        
+        # Score = number of distinct category keywords found, as before
         category_scores = {}
-        for category, keywords in self.categories.items():
-            score = sum(1 for kw in keywords if kw.lower() in keyword_lower)
-            if score > 0:
-                category_scores[category] = score
+        for category, pattern in self._patterns.items():
+            matches = pattern.findall(keyword)
+            if matches:
+                category_scores[category] = len({match.lower() for match in matches})
         
         if category_scores:
             return max(category_scores, key=category_scores.get)
@@ -298,86 +520,84 @@ class TrendCategorizer:
 class VisualizationGenerator:
     """Generate charts and visualizations for trends"""
     
+    # Charts are embedded at 6x4 inches in the reports; 150 dpi is plenty
+    DPI = 150
+    
     def __init__(self, output_dir: str):
         self.output_dir = output_dir
         os.makedirs(output_dir, exist_ok=True)
         sns.set_style("whitegrid")
-    
-    def generate_category_distribution(self, trends: List[Dict[str, Any]], filename: str = 'category_distribution.png'):
-        """Generate pie chart of trend categories"""
-        categories = [t['category'] for t in trends if 'category' in t]
-        category_counts = Counter(categories)
-        
-        plt.figure(figsize=(10, 8))
-        colors_palette = sns.color_palette("husl", len(category_counts))
-        plt.pie(category_counts.values(), labels=category_counts.keys(), autopct='%1.1f%%', colors=colors_palette)
-        plt.title('Trend Distribution by Category', fontsize=16, fontweight='bold')
         
+        # One figure reused (and cleared) for every chart
+        self.fig = plt.figure(figsize=(10, 8))
+    
+    def _new_axes(self, width: float, height: float):
+        """Reset the shared figure to the given size and return fresh axes"""
+        self.fig.clear()
+        self.fig.set_size_inches(width, height)
+        return self.fig.add_subplot(111)
+    
+    def _save(self, filename: str) -> str:
+        """Save the shared figure and clear it for the next chart"""
         filepath = os.path.join(self.output_dir, filename)
-        plt.savefig(filepath, dpi=300, bbox_inches='tight')
-        plt.close()
+        self.fig.savefig(filepath, dpi=self.DPI, bbox_inches='tight')
+        self.fig.clear()
         
         return filepath
     
-    def generate_platform_comparison(self, trends: List[Dict[str, Any]], filename: str = 'platform_comparison.png'):
-        """Generate bar chart comparing platforms"""
-        platforms = [t['platform'] for t in trends]
-        platform_counts = Counter(platforms)
+    def generate_category_distribution(self, category_counts: pd.Series, filename: str = 'category_distribution.png'):
+        """Generate pie chart of trend categories"""
+        ax = self._new_axes(10, 8)
+        colors_palette = sns.color_palette("husl", len(category_counts))
+        ax.pie(category_counts.values, labels=category_counts.index, autopct='%1.1f%%', colors=colors_palette)
+        ax.set_title('Trend Distribution by Category', fontsize=16, fontweight='bold')
         
-        plt.figure(figsize=(10, 6))
-        bars = plt.bar(platform_counts.keys(), platform_counts.values(), color=sns.color_palette("muted"))
-        plt.title('Trends by Platform', fontsize=16, fontweight='bold')
-        plt.xlabel('Platform', fontsize=12)
-        plt.ylabel('Number of Trends', fontsize=12)
-        plt.xticks(rotation=45)
+        return self._save(filename)
+    
+    def generate_platform_comparison(self, platform_counts: pd.Series, filename: str = 'platform_comparison.png'):
+        """Generate bar chart comparing platforms"""
+        ax = self._new_axes(10, 6)
+        bars = ax.bar(platform_counts.index, platform_counts.values, color=sns.color_palette("muted"))
+        ax.set_title('Trends by Platform', fontsize=16, fontweight='bold')
+        ax.set_xlabel('Platform', fontsize=12)
+        ax.set_ylabel('Number of Trends', fontsize=12)
+        ax.tick_params(axis='x', labelrotation=45)
         
         for bar in bars:
             height = bar.get_height()
-            plt.text(bar.get_x() + bar.get_width()/2., height,
+            ax.text(bar.get_x() + bar.get_width()/2., height,
                     f'{int(height)}', ha='center', va='bottom')
         
-        filepath = os.path.join(self.output_dir, filename)
-        plt.savefig(filepath, dpi=300, bbox_inches='tight')
-        plt.close()
-        
-        return filepath
+        return self._save(filename)
     
-    def generate_sentiment_distribution(self, trends: List[Dict[str, Any]], filename: str = 'sentiment_distribution.png'):
-        """Generate histogram of sentiment scores"""
-        sentiments = [t.get('sentiment_score', 0) for t in trends if 'sentiment_score' in t]
-        
-        plt.figure(figsize=(10, 6))
-        plt.hist(sentiments, bins=20, color='skyblue', edgecolor='black')
-        plt.title('Sentiment Score Distribution', fontsize=16, fontweight='bold')
-        plt.xlabel('Sentiment Score', fontsize=12)
-        plt.ylabel('Frequency', fontsize=12)
-        plt.axvline(x=0, color='red', linestyle='--', label='Neutral')
-        plt.legend()
-        
-        filepath = os.path.join(self.output_dir, filename)
-        plt.savefig(filepath, dpi=300, bbox_inches='tight')
-        plt.close()
-        
-        return filepath
+    def generate_sentiment_distribution(self, sentiment_hist: tuple, filename: str = 'sentiment_distribution.png'):
+        """Generate histogram of sentiment scores from (counts, bin_edges)"""
+        counts, bin_edges = sentiment_hist
+        
+        ax = self._new_axes(10, 6)
+        # Already binned: one weighted sample per bin draws the same bars
+        ax.hist(bin_edges[:-1], bins=bin_edges, weights=counts, color='skyblue', edgecolor='black')
+        ax.set_title('Sentiment Score Distribution', fontsize=16, fontweight='bold')
+        ax.set_xlabel('Sentiment Score', fontsize=12)
+        ax.set_ylabel('Frequency', fontsize=12)
+        ax.axvline(x=0, color='red', linestyle='--', label='Neutral')
+        ax.legend()
+        
+        return self._save(filename)
     
-    def generate_top_trends_chart(self, trends: List[Dict[str, Any]], top_n: int = 15, filename: str = 'top_trends.png'):
+    def generate_top_trends_chart(self, top_trends: pd.DataFrame, filename: str = 'top_trends.png'):
         """Generate horizontal bar chart of top trends"""
-        sorted_trends = sorted(trends, key=lambda x: x.get('volume', 0) + x.get('engagement_score', 0), reverse=True)[:top_n]
-        
-        keywords = [t['keyword'][:50] for t in sorted_trends]
-        scores = [t.get('volume', 0) + t.get('engagement_score', 0) for t in sorted_trends]
+        top_n = len(top_trends)
+        keywords = top_trends['keyword'].str[:50].tolist()
+        scores = top_trends['score'].tolist()
         
-        plt.figure(figsize=(12, 8))
-        bars = plt.barh(keywords, scores, color=sns.color_palette("coolwarm", len(keywords)))
-        plt.title(f'Top {top_n} Trending Topics', fontsize=16, fontweight='bold')
-        plt.xlabel('Engagement Score', fontsize=12)
-        plt.tight_layout()
+        ax = self._new_axes(12, 8)
+        ax.barh(keywords, scores, color=sns.color_palette("coolwarm", len(keywords)))
+        ax.set_title(f'Top {top_n} Trending Topics', fontsize=16, fontweight='bold')
+        ax.set_xlabel('Engagement Score', fontsize=12)
+        self.fig.tight_layout()
         
-        filepath = os.path.join(self.output_dir, filename)
-        plt.savefig(filepath, dpi=300, bbox_inches='tight')
-        plt.close()
-        
-        return filepath
+        return self._save(filename)
 
 
 class ReportGenerator:
@@ -387,7 +607,7 @@ class ReportGenerator:
         self.output_dir = output_dir
         os.makedirs(output_dir, exist_ok=True)
     
-    def generate_pdf_report(self, trends: List[Dict[str, Any]], chart_paths: Dict[str, str], filename: str = None):
+    def generate_pdf_report(self, df: pd.DataFrame, chart_paths: Dict[str, str], filename: str = None):
         """Generate comprehensive PDF report"""
         if filename is None:
             filename = f"trend_report_{datetime.now().strftime('%Y%m%d_%H%M%S')}.pdf"
@@ -424,7 +644,7 @@ class ReportGenerator:
         # Executive Summary
         story.append(Paragraph("Executive Summary", heading_style))
         summary_text = f"""
-        This report analyzes {len(trends)} trending topics across multiple platforms including Google Trends, 
+        This report analyzes {len(df)} trending topics across multiple platforms including Google Trends, 
         Reddit, and social media. The trends have been categorized, analyzed for sentiment, and ranked by 
         engagement metrics to provide actionable insights for digital marketing strategies.
         """
@@ -434,13 +654,13 @@ class ReportGenerator:
         # Key Metrics
         story.append(Paragraph("Key Metrics", heading_style))
         
-        categories = Counter([t.get('category', 'Uncategorized') for t in trends])
-        avg_sentiment = sum([t.get('sentiment_score', 0) for t in trends]) / len(trends) if trends else 0
+        categories = df['category'].fillna('Uncategorized').value_counts()
+        avg_sentiment = np.nan_to_num(df['sentiment_score'].mean())  # unscored trends are NaN and skipped
         
         metrics_data = [
             ['Metric', 'Value'],
-            ['Total Trends Analyzed', str(len(trends))],
-            ['Most Common Category', categories.most_common(1)[0][0] if categories else 'N/A'],
+            ['Total Trends Analyzed', str(len(df))],
+            ['Most Common Category', categories.index[0] if len(categories) else 'N/A'],
             ['Average Sentiment Score', f"{avg_sentiment:.2f}"],
             ['Platforms Monitored', '3 (Google Trends, Reddit, Twitter)']
         ]
@@ -476,17 +696,16 @@ class ReportGenerator:
         story.append(PageBreak())
         story.append(Paragraph("Top 20 Marketing Trends", heading_style))
         
-        sorted_trends = sorted(trends, key=lambda x: x.get('volume', 0) + x.get('engagement_score', 0), reverse=True)[:20]
+        top_trends = df.nlargest(20, 'score')
         
         trends_data = [['Rank', 'Keyword', 'Category', 'Platform', 'Score']]
-        for idx, trend in enumerate(sorted_trends, 1):
-            score = trend.get('volume', 0) + trend.get('engagement_score', 0)
+        for idx, trend in enumerate(top_trends.itertuples(index=False), 1):
             trends_data.append([
                 str(idx),
-                trend['keyword'][:40],
-                trend.get('category', 'N/A')[:20],
-                trend['platform'],
-                str(int(score))
+                trend.keyword[:40],
+                (trend.category or 'N/A')[:20],
+                trend.platform,
+                str(int(trend.score))
             ])
         
         trends_table = Table(trends_data, colWidths=[0.5*inch, 2.5*inch, 1.5*inch, 1*inch, 0.8*inch])
@@ -508,16 +727,18 @@ class ReportGenerator:
         print(f"PDF report generated: {filepath}")
         return filepath
     
-    def generate_html_report(self, trends: List[Dict[str, Any]], chart_paths: Dict[str, str], filename: str = None):
+    def generate_html_report(self, df: pd.DataFrame, chart_paths: Dict[str, str], filename: str = None):
         """Generate HTML report"""
         if filename is None:
             filename = f"trend_report_{datetime.now().strftime('%Y%m%d_%H%M%S')}.html"
         
         filepath = os.path.join(self.output_dir, filename)
         
-        sorted_trends = sorted(trends, key=lambda x: x.get('volume', 0) + x.get('engagement_score', 0), reverse=True)[:20]
+        top_trends = df.nlargest(20, 'score')
+        avg_sentiment = np.nan_to_num(df['sentiment_score'].mean())  # unscored trends are NaN and skipped
         
-        html_content = f"""
+        # Collect fragments and join once instead of growing one string with +=
+        parts = [f"""
         <!DOCTYPE html>
         <html>
         <head>
@@ -549,7 +770,7 @@ class ReportGenerator:
                 <div class="metrics">
                     <div class="metric-card">
                         <h3>Total Trends Analyzed</h3>
-                        <p>{len(trends)}</p>
+                        <p>{len(df)}</p>
                     </div>
                     <div class="metric-card">
                         <h3>Platforms Monitored</h3>
@@ -557,7 +778,7 @@ class ReportGenerator:
                     </div>
                     <div class="metric-card">
                         <h3>Average Sentiment</h3>
-                        <p>{sum([t.get('sentiment_score', 0) for t in trends]) / len(trends) if trends else 0:.2f}</p>
+                        <p>{avg_sentiment:.2f}</p>
                     </div>
                     <div class="metric-card">
                         <h3>Report Period</h3>
@@ -566,18 +787,18 @@ class ReportGenerator:
                 </div>
                 
                 <h2>Visual Analysis</h2>
-        """
+        """]
         
         for chart_title, chart_path in chart_paths.items():
             if os.path.exists(chart_path):
-                html_content += f"""
+                parts.append(f"""
                 <div class="chart">
                     <h3>{chart_title}</h3>
                     <img src="{os.path.basename(chart_path)}" alt="{chart_title}">
                 </div>
-                """
+                """)
         
-        html_content += """
+        parts.append("""
                 <h2>Top 20 Marketing Trends</h2>
                 <table>
                     <tr>
@@ -588,33 +809,36 @@ class ReportGenerator:
                         <th>Engagement Score</th>
                         <th>Sentiment</th>
                     </tr>
-        """
-        
-        for idx, trend in enumerate(sorted_trends, 1):
-            score = trend.get('volume', 0) + trend.get('engagement_score', 0)
-            sentiment = trend.get('sentiment_score', 0)
-            sentiment_label = 'Positive' if sentiment > 0.3 else 'Negative' if sentiment < -0.3 else 'Neutral'
+        """)
+        
+        for idx, trend in enumerate(top_trends.itertuples(index=False), 1):
+            sentiment = trend.sentiment_score
+            if pd.isna(sentiment):
+                sentiment_text = 'Not scored'
+            else:
+                sentiment_label = 'Positive' if sentiment > 0.3 else 'Negative' if sentiment < -0.3 else 'Neutral'
+                sentiment_text = f"{sentiment_label} ({sentiment:.2f})"
             
-            html_content += f"""
+            parts.append(f"""
                     <tr>
                         <td>{idx}</td>
-                        <td>{trend['keyword']}</td>
-                        <td>{trend.get('category', 'N/A')}</td>
-                        <td>{trend['platform']}</td>
-                        <td>{int(score)}</td>
-                        <td>{sentiment_label} ({sentiment:.2f})</td>
+                        <td>{trend.keyword}</td>
+                        <td>{trend.category or 'N/A'}</td>
+                        <td>{trend.platform}</td>
+                        <td>{int(trend.score)}</td>
+                        <td>{sentiment_text}</td>
                     </tr>
-            """
+            """)
         
-        html_content += """
+        parts.append("""
                 </table>
             </div>
         </body>
         </html>
-        """
+        """)
         
         with open(filepath, 'w', encoding='utf-8') as f:
-            f.write(html_content)
+            f.write(''.join(parts))
         
         print(f"HTML report generated: {filepath}")
         return filepath
@@ -623,78 +847,149 @@ class ReportGenerator:
 class TrendExtractor:
     """Main orchestrator for trend extraction workflow"""
     
+    _NON_WORD = re.compile(r'\W+')
+    
     def __init__(self):
         self.config = Config()
         self.db = DatabaseManager(self.config.DB_NAME)
         self.categorizer = TrendCategorizer(self.config.CATEGORIES)
-        self.sentiment_analyzer = SentimentAnalyzer(self.config.GEMINI_API_KEY)
+        self.sentiment_analyzer = SentimentAnalyzer(self.config.GEMINI_API_KEY, self.db, self.config.GEMINI_MODEL)
         self.viz_generator = VisualizationGenerator(self.config.CHARTS_OUTPUT_DIR)
         self.report_generator = ReportGenerator(self.config.REPORT_OUTPUT_DIR)
         
+        # Ranked summaries keyed by top_n; cleared whenever new trends are saved
+        self._summary_cache = {}
+        
         # Initialize monitors
         self.google_trends = GoogleTrendsMonitor()
         try:
             self.reddit_monitor = RedditMonitor(
                 self.config.REDDIT_CLIENT_ID,
                 self.config.REDDIT_CLIENT_SECRET,
-                self.config.REDDIT_USER_AGENT
+                self.config.REDDIT_USER_AGENT,
+                self.config.MIN_ENGAGEMENT
             )
         except Exception as e:
             print(f"Warning: Reddit monitor initialization failed: {e}")
             self.reddit_monitor = None
     
-    def extract_trends(self) -> List[Dict[str, Any]]:
+    def close(self):
+        """Release the database connection"""
+        self.db.close()
+    
+    def extract_trends(self) -> Iterator[Dict[str, Any]]:
         """Extract trends from all platforms"""
-        all_trends = []
-        
         print("Fetching trends from Google Trends...")
-        google_trends = self.google_trends.get_trending_topics(self.config.MARKETING_KEYWORDS)
-        all_trends.extend(google_trends)
-        
-        if self.reddit_monitor:
-            print("Fetching trends from Reddit...")
-            reddit_trends = self.reddit_monitor.get_trending_topics()
-            all_trends.extend(reddit_trends)
         
-        return all_trends
+        # Google Trends and Reddit are independent, so Reddit is fetched in the
+        # background while Google Trends results are streamed
+        with ThreadPoolExecutor(max_workers=1) as executor:
+            reddit_future = None
+            if self.reddit_monitor:
+                print("Fetching trends from Reddit...")
+                reddit_future = executor.submit(self.reddit_monitor.get_trending_topics)
+            
+            yield from self.google_trends.iter_trending_topics(self.config.MARKETING_KEYWORDS)
+            if reddit_future:
+                yield from reddit_future.result()
     
-    def process_trends(self, trends: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    @classmethod
+    def _normalize_keyword(cls, keyword: str) -> str:
+        """Dedup key: lowercase with punctuation and whitespace runs collapsed"""
+        # Emoji- or punctuation-only titles normalize to nothing; keep them apart
+        return cls._NON_WORD.sub(' ', keyword.lower()).strip() or keyword
+    
+    def process_trends(self, trends: Iterable[Dict[str, Any]]) -> List[Dict[str, Any]]:
         """Process trends: categorize and analyze sentiment"""
+        # Sentiment is scored in batches and the report needs random access,
+        # so this is the one list the trends are collected into
+        trends = trends if isinstance(trends, list) else list(trends)
         print("Processing trends...")
         
         for trend in trends:
-            # Categorize
-            trend['category'] = self.categorizer.categorize(trend['keyword'])
-            
-            # Analyze sentiment
-            if 'sentiment_score' not in trend:
-                trend['sentiment_score'] = self.sentiment_analyzer.analyze_sentiment(trend['keyword'])
-            
             # Ensure engagement score exists
             if 'engagement_score' not in trend:
                 trend['engagement_score'] = trend.get('volume', 0)
             
-            # Save to database
-            self.db.save_trend(trend)
+            # Composite ranking score, computed once for charts and reports
+            trend['score'] = (trend.get('volume') or 0) + (trend.get('engagement_score') or 0)
+        
+        # Cross-posts and repeated titles differing only in case or punctuation
+        # are analyzed once and the results shared across the group
+        groups = {}
+        best_scores = {}
+        for trend in trends:
+            key = self._normalize_keyword(trend['keyword'])
+            groups.setdefault(key, []).append(trend)
+            best_scores[key] = max(best_scores.get(key, trend['score']), trend['score'])
+        
+        # Analyze sentiment for all unscored keywords in batched requests
+        unscored = [
+            (best_scores[key], group) for key, group in groups.items()
+            if any('sentiment_score' not in trend for trend in group)
+        ]
+        
+        # Only pay for sentiment on the highest-scoring keywords; every trend is
+        # still categorized, saved and charted
+        if len(unscored) > self.config.MAX_TRENDS:
+            unscored = heapq.nlargest(self.config.MAX_TRENDS, unscored, key=itemgetter(0))
+        
+        scores = self.sentiment_analyzer.batch_analyze([group[0]['keyword'] for _, group in unscored])
+        for (_, group), score in zip(unscored, scores):
+            for trend in group:
+                trend.setdefault('sentiment_score', score)
+        
+        for group in groups.values():
+            # Categorize
+            category = self.categorizer.categorize(group[0]['keyword'])
+            
+            for trend in group:
+                trend['category'] = category
+                
+                # Keywords left out of sentiment analysis are stored unscored (NULL),
+                # so averages skip them instead of counting them as neutral
+                trend.setdefault('sentiment_score', None)
+        
+        # Save to database in one batch
+        self.db.save_trends(trends)
+        self._summary_cache.clear()
         
         return trends
     
+    @staticmethod
+    def _aggregate(df: pd.DataFrame, top_n: int = 15) -> Dict[str, Any]:
+        """Compute the data behind all four charts up front"""
+        sentiments = df['sentiment_score'].dropna().to_numpy(dtype=float)
+        
+        return {
+            'category_counts': df['category'].value_counts(),
+            'platform_counts': df['platform'].value_counts(),
+            'sentiment_hist': np.histogram(sentiments, bins=20),
+            'top_trends': df.nlargest(top_n, 'score')[['keyword', 'score']]
+        }
+    
     def generate_report(self, trends: List[Dict[str, Any]]):
         """Generate visualizations and reports"""
+        # Load the trends into columns once; charts and reports share the frame
+        # (numeric dtypes fixed up front so an empty run still ranks and charts)
+        df = pd.DataFrame(trends, columns=['keyword', 'platform', 'category', 'volume', 'engagement_score', 'sentiment_score', 'score'])
+        df = df.astype({'volume': float, 'engagement_score': float, 'sentiment_score': float, 'score': float})
+        
         print("Generating visualizations...")
         
+        agg = self._aggregate(df)
         chart_paths = {
-            'Category Distribution': self.viz_generator.generate_category_distribution(trends),
-            'Platform Comparison': self.viz_generator.generate_platform_comparison(trends),
-            'Sentiment Distribution': self.viz_generator.generate_sentiment_distribution(trends),
-            'Top Trends': self.viz_generator.generate_top_trends_chart(trends)
+            'Category Distribution': self.viz_generator.generate_category_distribution(agg['category_counts']),
+            'Platform Comparison': self.viz_generator.generate_platform_comparison(agg['platform_counts']),
+            'Sentiment Distribution': self.viz_generator.generate_sentiment_distribution(agg['sentiment_hist']),
+            'Top Trends': self.viz_generator.generate_top_trends_chart(agg['top_trends'])
         }
         
         print("Generating PDF report...")
-        pdf_path = self.report_generator.generate_pdf_report(trends, chart_paths)
+        pdf_path = self.report_generator.generate_pdf_report(df, chart_paths)
         
         print("Generating HTML report...")
-        html_path = self.report_generator.generate_html_report(trends, chart_paths)
+        html_path = self.report_generator.generate_html_report(df, chart_paths)
         
         return {
             'pdf_report': pdf_path,
@@ -708,13 +1003,9 @@ class TrendExtractor:
         print("Starting Trend Extraction Workflow")
         print("="*60)
         
-        # Extract trends
-        trends = self.extract_trends()
-        print(f"\nExtracted {len(trends)} trends from all platforms")
-        
-        # Process trends
-        processed_trends = self.process_trends(trends)
-        print(f"Processed {len(processed_trends)} trends")
+        # Extract and process trends
+        processed_trends = self.process_trends(self.extract_trends())
+        print(f"\nExtracted and processed {len(processed_trends)} trends from all platforms")
         
         # Generate reports
         report_paths = self.generate_report(processed_trends)
@@ -730,52 +1021,60 @@ class TrendExtractor:
         
         return report_paths
     
-    def get_current_trends_summary(self, top_n: int = 20) -> List[Dict[str, Any]]:
-        """Get summary of current top trends"""
-        trends = self.db.get_historical_trends(days=7)
+    def get_current_trends_summary(self, top_n: int = 20) -> pd.DataFrame:
+        """Get summary of current top trends, one row per keyword, best first"""
+        # Any cached ranking at least top_n long already holds the answer; hand
+        # out copies so callers can't mutate the cached frame
+        for cached_n, summary in self._summary_cache.items():
+            if cached_n >= top_n:
+                return summary.head(top_n).copy()
+        
+        summary = self._build_summary(top_n)
+        self._summary_cache[top_n] = summary
+        
+        return summary.copy()
+    
+    def _build_summary(self, top_n: int) -> pd.DataFrame:
+        """Aggregate the last week's trends by keyword and rank the top N"""
+        # Load rows straight from the cursor; no per-trend dicts or metadata decoding
+        df = pd.DataFrame.from_records(
+            self.db.iter_historical_trends(days=7),
+            columns=DatabaseManager.HISTORY_COLUMNS,
+            exclude=['timestamp', 'metadata']
+        )
         
-        # Aggregate by keyword
-        keyword_data = {}
-        for trend in trends:
-            keyword = trend['keyword']
-            if keyword not in keyword_data:
-                keyword_data[keyword] = {
-                    'keyword': keyword,
-                    'platforms': set(),
-                    'categories': set(),
-                    'total_volume': 0,
-                    'total_engagement': 0,
-                    'sentiment_scores': [],
-                    'occurrences': 0
-                }
-            
-            keyword_data[keyword]['platforms'].add(trend['platform'])
-            keyword_data[keyword]['categories'].add(trend['category'])
-            keyword_data[keyword]['total_volume'] += trend['volume']
-            keyword_data[keyword]['total_engagement'] += trend['engagement_score']
-            keyword_data[keyword]['sentiment_scores'].append(trend['sentiment_score'])
-            keyword_data[keyword]['occurrences'] += 1
-        
-        # Convert to list and calculate averages
-        summary = []
-        for data in keyword_data.values():
-            avg_sentiment = sum(data['sentiment_scores']) / len(data['sentiment_scores']) if data['sentiment_scores'] else 0
-            
-            summary.append({
-                'keyword': data['keyword'],
-                'platforms': list(data['platforms']),
-                'categories': list(data['categories']),
-                'total_volume': data['total_volume'],
-                'total_engagement': data['total_engagement'],
-                'avg_sentiment': avg_sentiment,
-                'occurrences': data['occurrences'],
-                'combined_score': data['total_volume'] + data['total_engagement']
-            })
+        if df.empty:
+            return pd.DataFrame(columns=[
+                'keyword', 'platforms', 'categories', 'total_volume', 'total_engagement',
+                'avg_sentiment', 'occurrences', 'combined_score', 'sentiment_label'
+            ])
         
-        # Sort by combined score
-        summary.sort(key=lambda x: x['combined_score'], reverse=True)
+        # Aggregate by keyword with pandas' grouped reductions
+        agg = df.groupby('keyword', sort=False).agg(
+            platforms=('platform', 'unique'),
+            categories=('category', 'unique'),
+            total_volume=('volume', 'sum'),
+            total_engagement=('engagement_score', 'sum'),
+            avg_sentiment=('sentiment_score', 'mean'),
+            occurrences=('keyword', 'size')
+        )
+        agg['combined_score'] = agg['total_volume'] + agg['total_engagement']
+        
+        # Partial selection of the top N by combined score; every per-row step
+        # below only touches those rows
+        top = agg.nlargest(top_n, 'combined_score')
+        top['platforms'] = top['platforms'].map(list)
+        top['categories'] = top['categories'].map(list)
+        
+        # Label all rows at once (thresholds are exclusive on both sides, so not pd.cut);
+        # keywords never sent for sentiment analysis keep a NaN average
+        top['sentiment_label'] = np.select(
+            [top['avg_sentiment'].isna(), top['avg_sentiment'] > 0.3, top['avg_sentiment'] < -0.3],
+            ['Not scored', 'Positive', 'Negative'],
+            default='Neutral'
+        )
         
-        return summary[:top_n]
+        return top.reset_index()
 
 
 def main():
@@ -798,18 +1097,21 @@ def main():
         # Get and display top trends
         top_trends = extractor.get_current_trends_summary(top_n=20)
         
-        print("\n📊 TOP 20 CURRENT MARKETING TRENDS:\n")
-        print(f"{'#':<4} {'Trend':<50} {'Category':<25} {'Score':<10} {'Sentiment':<10}")
-        print("-" * 100)
+        # Build the whole table and print it once
+        out = [
+            "\n📊 TOP 20 CURRENT MARKETING TRENDS:\n",
+            SUMMARY_ROW_FMT('#', 'Trend', 'Category', 'Score', 'Sentiment'),
+            "-" * 100
+        ]
         
-        for idx, trend in enumerate(top_trends, 1):
-            keyword = trend['keyword'][:47] + "..." if len(trend['keyword']) > 50 else trend['keyword']
-            category = trend['categories'][0] if trend['categories'] else 'General'
+        for idx, trend in enumerate(top_trends.itertuples(index=False), 1):
+            keyword = trend.keyword[:47] + "..." if len(trend.keyword) > 50 else trend.keyword
+            category = trend.categories[0] if trend.categories else 'General'
             category = category[:22] + "..." if len(category) > 25 else category
-            score = int(trend['combined_score'])
-            sentiment = 'Positive' if trend['avg_sentiment'] > 0.3 else 'Negative' if trend['avg_sentiment'] < -0.3 else 'Neutral'
             
-            print(f"{idx:<4} {keyword:<50} {category:<25} {score:<10} {sentiment:<10}")
+            out.append(SUMMARY_ROW_FMT(idx, keyword, category, int(trend.combined_score), trend.sentiment_label))
+        
+        print('\n'.join(out))
         
         print("\n" + "="*60)
         print("✅ All reports and visualizations generated successfully!")
@@ -819,9 +1121,11 @@ def main():
         
     except Exception as e:
         print(f"\n❌ Error during execution: {e}")
-        import traceback
         traceback.print_exc()
         return None
+    
+    finally:
+        extractor.close()
 
 
 if __name__ == "__main__":